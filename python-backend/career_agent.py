@@ -3,11 +3,14 @@ LangGraph-based Career Assistant Agent
 This module implements a multi-agent system for resume analysis and career guidance.
 """
 
+import asyncio
 import json
+import orjson
 import re
-from typing import Dict, List, Any, TypedDict, Annotated, Tuple
+from typing import AsyncIterator, Dict, List, Any, TypedDict, Annotated, Tuple
 from operator import add
 from collections import Counter
+from functools import lru_cache
 import nltk
 from nltk.corpus import wordnet
 import google.generativeai as genai
@@ -20,21 +23,37 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+@lru_cache(maxsize=None)
+def _has_nltk(resource: str) -> bool:
+    """Report whether an NLTK data resource is present, one stat-walk each."""
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
 # Download NLTK data if not already present
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
+if not _has_nltk('tokenizers/punkt'):
     nltk.download('punkt')
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
+if not _has_nltk('tokenizers/punkt_tab'):
     nltk.download('punkt_tab')
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
+if not _has_nltk('corpora/wordnet'):
     nltk.download('wordnet')
 
 
+def _loads(content: str) -> Any:
+    """Parse LLM JSON output with orjson, falling back to stdlib json.
+
+    orjson is 2-5x faster on the multi-KB payloads the resume parser returns,
+    but it is strict; the stdlib parser handles the occasional lenient output.
+    """
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return json.loads(content)
+
+
 class CareerAssistantState(TypedDict):
     """State for the career assistant workflow"""
     resume_text: str
@@ -87,7 +106,58 @@ class InterviewQuestion(BaseModel):
     difficulty: str
 
 
+# Static instruction blocks for the resume-enhancement prompts, built once at
+# module scope so each call only allocates the dynamic HumanMessage. Keeping
+# the static portion first also makes it cacheable on the provider side.
+SUMMARY_ENHANCE_SYS_MSG = SystemMessage(content="""
+ENHANCE the professional summary you are given to be more ATS-friendly and compelling while preserving the original meaning and achievements.
+
+ENHANCEMENT RULES:
+1. Keep all original achievements and numbers
+2. Add relevant keywords from the job description naturally
+3. Make it more action-oriented and results-focused
+4. Ensure it's 2-3 sentences maximum
+5. Start with a strong professional descriptor
+6. Maintain the candidate's authentic voice
+7. DO NOT fabricate new achievements or experience
+
+Return ONLY the enhanced professional summary text.
+""")
+
+EXPERIENCE_ENHANCE_SYS_MSG = SystemMessage(content="""
+ENHANCE the work experience description you are given to be more ATS-friendly and impactful while preserving all original achievements and numbers.
+
+ENHANCEMENT RULES:
+1. Keep ALL original achievements, metrics, and numbers intact
+2. Use strong action verbs (developed, implemented, optimized, etc.)
+3. Add relevant keywords from job description naturally
+4. Make bullet points more specific and results-oriented
+5. Quantify impact wherever possible
+6. DO NOT fabricate new achievements or numbers
+7. Format as HTML with <br> for line breaks between bullet points
+8. Keep it concise but impactful (3-5 bullet points max)
+
+Return ONLY the enhanced experience description with HTML formatting.
+""")
+
+
 class CareerAssistantAgent:
+    # Per-section entry caps applied when assembling the one-page ATS resume.
+    # Kept in one place so the limits can be tuned for a different template
+    # (e.g. a two-page resume) without hunting down scattered slices.
+    SECTION_LIMITS = {
+        'experiences': 3,
+        'projects': 2,
+        'certifications': 4,
+        'awards': 3,
+        'languages': 5,
+        'volunteer': 3,
+        'publications': 3,
+        'skills': 20,
+        'project_techs': 8,
+        'project_achievements': 3,
+    }
+
     def __init__(self, api_key: str):
         """Initialize the career assistant agent with Gemini AI"""
         genai.configure(api_key=api_key)
@@ -97,7 +167,22 @@ class CareerAssistantAgent:
             google_api_key=api_key
         )
         self.workflow = self._build_workflow()
-    
+
+    async def aclose(self):
+        """
+        Release network resources held by the shared Gemini client.
+
+        The client is created once in __init__ and reused across requests so
+        LLM calls share a warm connection pool; call this from the server's
+        shutdown hook so pooled connections don't linger on exit.
+        """
+        client = getattr(self.llm, "client", None)
+        close = getattr(client, "close", None)
+        if callable(close):
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow for career analysis"""
         
@@ -1322,8 +1407,10 @@ class CareerAssistantAgent:
             errors=[]
         )
         
-        # Execute the workflow
-        final_state = self.workflow.invoke(initial_state)
+        # Execute the workflow; ainvoke runs the sync nodes off-loop, so
+        # concurrent analyses actually overlap instead of serializing on
+        # the event-loop thread
+        final_state = await self.workflow.ainvoke(initial_state)
         
         return {
             "ats_score": final_state["ats_score"],
@@ -1339,6 +1426,57 @@ class CareerAssistantAgent:
             "errors": final_state.get("errors", [])
         }
 
+    async def analyze_stream(self, resume_text: str, job_description: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run the analysis workflow, yielding (section, payload) pairs as the
+        workflow nodes that complete each response section finish.
+
+        Sections arrive in workflow order, so callers can forward early
+        sections (ATS score, skills analysis) to the client while the later
+        nodes are still running.
+        """
+
+        initial_state = CareerAssistantState(
+            resume_text=resume_text,
+            job_description=job_description,
+            extracted_keywords=[],
+            extracted_skills=[],
+            missing_skills=[],
+            keyword_repetitions={},
+            ats_score={},
+            learning_roadmap={},
+            resources={},
+            projects=[],
+            jobs=[],
+            interview_questions=[],
+            errors=[]
+        )
+
+        final_state = dict(initial_state)
+        async for step in self.workflow.astream(initial_state):
+            for node_name, state_update in step.items():
+                final_state.update(state_update)
+
+                if node_name == "calculate_ats_score":
+                    yield "ats_score", final_state["ats_score"]
+                elif node_name == "analyze_repetitions":
+                    yield "skills_analysis", {
+                        "missing_skills": final_state["missing_skills"],
+                        "keyword_repetitions": final_state["keyword_repetitions"]
+                    }
+                elif node_name == "generate_roadmap":
+                    yield "learning_roadmap", final_state["learning_roadmap"]
+                elif node_name == "create_resources":
+                    yield "resources", final_state["resources"]
+                elif node_name == "suggest_projects":
+                    yield "projects", final_state["projects"]
+                elif node_name == "find_jobs":
+                    yield "jobs", final_state["jobs"]
+                elif node_name == "prepare_interview":
+                    yield "interview_questions", final_state["interview_questions"]
+
+        yield "errors", final_state.get("errors", [])
+
     async def generate_ats_resume(self, resume_text: str, job_description: str, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate an ATS-optimized resume by analyzing and enhancing the user's actual resume content.
@@ -1522,7 +1660,7 @@ class CareerAssistantAgent:
             content = re.sub(r'^```json\s*', '', content)
             content = re.sub(r'\s*```$', '', content)
             
-            parsed_data = json.loads(content)
+            parsed_data = _loads(content)
             return parsed_data
             
         except Exception as e:
@@ -2317,42 +2455,49 @@ class CareerAssistantAgent:
             "projects": projects
         }
     
+    def _keyword_overlap(self, text: str, keywords: List[str]) -> int:
+        """Count how many of the given keywords appear in the text (case-insensitive)."""
+        text_lower = text.lower()
+        return sum(1 for kw in keywords if kw and kw.lower() in text_lower)
+
     async def _enhance_professional_summary(self, original_summary: str, job_description: str, analysis_data: Dict[str, Any]) -> str:
         """Enhance the original professional summary for ATS optimization while preserving all content"""
         if not original_summary or not original_summary.strip():
             # Generate based on resume analysis if no summary exists
             return self._generate_ats_summary("", job_description, analysis_data)
-        
+
+        # Skip the LLM round trip entirely when the summary is already
+        # substantial and covers enough of the job's key skills.
+        jd_keywords = analysis_data.get('skills_analysis', {}).get('missing_skills', [])[:20]
+        if (len(original_summary) >= 150 and jd_keywords
+                and self._keyword_overlap(original_summary, jd_keywords) >= max(3, len(jd_keywords) // 3)):
+            return original_summary
+
         # Use AI to enhance the original summary for ATS optimization
         prompt = f"""
-        ENHANCE this professional summary to be more ATS-friendly and compelling while preserving the original meaning and achievements.
-        
         ORIGINAL SUMMARY:
         {original_summary}
-        
+
         JOB REQUIREMENTS:
         {job_description[:500]}
-        
-        ENHANCEMENT RULES:
-        1. Keep all original achievements and numbers
-        2. Add relevant keywords from the job description naturally
-        3. Make it more action-oriented and results-focused
-        4. Ensure it's 2-3 sentences maximum
-        5. Start with a strong professional descriptor
-        6. Maintain the candidate's authentic voice
-        7. DO NOT fabricate new achievements or experience
-        
-        Return ONLY the enhanced professional summary text:
         """
-        
+
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            enhanced_summary = response.content.strip()
-            
+            # Stream the completion and stop early once we have enough text:
+            # the prompt asks for 2-3 sentences, so anything past ~600 chars
+            # (or a paragraph break) is wasted output tokens.
+            buf = ""
+            summary_llm = self.llm.bind(max_output_tokens=150)
+            async for chunk in summary_llm.astream([SUMMARY_ENHANCE_SYS_MSG, HumanMessage(content=prompt)]):
+                buf += chunk.content
+                if len(buf) > 600 or '\n\n' in buf:
+                    break
+            enhanced_summary = buf.split('\n\n')[0].strip()
+
             # Fallback to original if enhancement fails
             if not enhanced_summary or len(enhanced_summary) < 20:
                 return original_summary
-                
+
             return enhanced_summary
         except Exception:
             return original_summary
@@ -2362,46 +2507,43 @@ class CareerAssistantAgent:
         if not original_experiences:
             return []
         
+        jd_keywords = analysis_data.get('skills_analysis', {}).get('missing_skills', [])[:20]
+
         enhanced_experiences = []
-        for exp in original_experiences[:3]:  # Limit to 3 for one-page resume
+        for exp in original_experiences[:self.SECTION_LIMITS['experiences']]:
             original_description = exp.get('description', exp.get('workSummery', ''))
             achievements = exp.get('achievements', [])
-            
+
             # Combine description and achievements for enhancement
             full_content = original_description
             if achievements:
                 full_content += '\n\n' + '\n'.join(f'• {ach}' for ach in achievements)
-            
+
+            # Same short-circuit as the summary enhancer: if the entry already
+            # mentions enough of the job's key skills, keep it as-is.
+            if (len(full_content) >= 150 and jd_keywords
+                    and self._keyword_overlap(full_content, jd_keywords) >= max(3, len(jd_keywords) // 3)):
+                enhanced_experiences.append(self._format_experience(exp, full_content.replace('\n', '<br>')))
+                continue
+
             # Use AI to enhance the experience description
             prompt = f"""
-            ENHANCE this work experience description to be more ATS-friendly and impactful while preserving all original achievements and numbers.
-            
             JOB TITLE: {exp.get('title', '')}
             COMPANY: {exp.get('company', exp.get('companyName', ''))}
-            
+
             ORIGINAL EXPERIENCE:
             {full_content}
-            
+
             JOB REQUIREMENTS FOR REFERENCE:
             {job_description[:400]}
-            
-            ENHANCEMENT RULES:
-            1. Keep ALL original achievements, metrics, and numbers intact
-            2. Use strong action verbs (developed, implemented, optimized, etc.)
-            3. Add relevant keywords from job description naturally
-            4. Make bullet points more specific and results-oriented
-            5. Quantify impact wherever possible
-            6. DO NOT fabricate new achievements or numbers
-            7. Format as HTML with <br> for line breaks between bullet points
-            8. Keep it concise but impactful (3-5 bullet points max)
-            
-            Return ONLY the enhanced experience description with HTML formatting:
             """
-            
+
             try:
-                response = self.llm.invoke([HumanMessage(content=prompt)])
+                # Cap output tokens: the prompt asks for 3-5 bullet points,
+                # so anything beyond ~350 tokens would be discarded anyway.
+                response = self.llm.bind(max_output_tokens=350).invoke([EXPERIENCE_ENHANCE_SYS_MSG, HumanMessage(content=prompt)])
                 enhanced_description = response.content.strip()
-                
+
                 # Fallback to original if enhancement fails
                 if not enhanced_description or len(enhanced_description) < 20:
                     enhanced_description = full_content.replace('\n', '<br>')
@@ -2409,20 +2551,22 @@ class CareerAssistantAgent:
             except Exception:
                 enhanced_description = full_content.replace('\n', '<br>')
             
-            formatted_exp = {
-                'title': exp.get('title', ''),
-                'companyName': exp.get('company', exp.get('companyName', '')),
-                'city': exp.get('city', exp.get('location', '').split(',')[0] if exp.get('location') else ''),
-                'state': exp.get('state', ''),
-                'startDate': exp.get('startDate', ''),
-                'endDate': exp.get('endDate', 'Present'),
-                'currentlyWorking': exp.get('currentlyWorking', exp.get('endDate', '').lower() == 'present'),
-                'workSummery': enhanced_description
-            }
-            
-            enhanced_experiences.append(formatted_exp)
-            
+            enhanced_experiences.append(self._format_experience(exp, enhanced_description))
+
         return enhanced_experiences
+
+    def _format_experience(self, exp: Dict[str, Any], description: str) -> Dict[str, Any]:
+        """Format an experience entry into the AI Resume Builder structure"""
+        return {
+            'title': exp.get('title', ''),
+            'companyName': exp.get('company', exp.get('companyName', '')),
+            'city': exp.get('city', exp.get('location', '').split(',')[0] if exp.get('location') else ''),
+            'state': exp.get('state', ''),
+            'startDate': exp.get('startDate', ''),
+            'endDate': exp.get('endDate', 'Present'),
+            'currentlyWorking': exp.get('currentlyWorking', exp.get('endDate', '').lower() == 'present'),
+            'workSummery': description
+        }
     
     def _enhance_education_section(self, original_education: List[Dict]) -> List[Dict[str, Any]]:
         """Preserve and format original education data"""
@@ -2460,7 +2604,7 @@ class CareerAssistantAgent:
         
         # Format skills for display (remove rating for ATS compatibility)
         formatted_skills = []
-        for skill in all_skills[:20]:  # Limit to 20 skills
+        for skill in all_skills[:self.SECTION_LIMITS['skills']]:
             if isinstance(skill, dict):
                 formatted_skills.append({'name': skill.get('name', str(skill))})
             else:
@@ -2474,7 +2618,7 @@ class CareerAssistantAgent:
             return []
             
         enhanced_projects = []
-        for proj in original_projects[:2]:  # Limit to 2 projects
+        for proj in original_projects[:self.SECTION_LIMITS['projects']]:
             # Enhance project description to be more professional and impactful
             original_desc = proj.get('description', '')
             achievements = proj.get('achievements', [])
@@ -2495,8 +2639,8 @@ class CareerAssistantAgent:
             formatted_proj = {
                 'name': proj.get('name', ''),
                 'description': enhanced_description,
-                'technologies': proj.get('technologies', [])[:8],  # Limit to 8 technologies
-                'achievements': achievements[:3]  # Limit to 3 achievements
+                'technologies': proj.get('technologies', [])[:self.SECTION_LIMITS['project_techs']],
+                'achievements': achievements[:self.SECTION_LIMITS['project_achievements']]
             }
             enhanced_projects.append(formatted_proj)
             
@@ -2508,7 +2652,7 @@ class CareerAssistantAgent:
             return []
             
         formatted_certifications = []
-        for cert in original_certifications[:4]:  # Limit to 4 certifications
+        for cert in original_certifications[:self.SECTION_LIMITS['certifications']]:
             formatted_cert = {
                 'name': cert.get('name', cert.get('title', '')),
                 'organization': cert.get('organization', ''),
@@ -2525,7 +2669,7 @@ class CareerAssistantAgent:
             return []
             
         formatted_awards = []
-        for award in original_awards[:3]:  # Limit to 3 awards
+        for award in original_awards[:self.SECTION_LIMITS['awards']]:
             formatted_award = {
                 'title': award.get('title', award.get('name', '')),
                 'organization': award.get('organization', ''),
@@ -2542,7 +2686,7 @@ class CareerAssistantAgent:
             return []
             
         formatted_languages = []
-        for lang in original_languages[:5]:  # Limit to 5 languages
+        for lang in original_languages[:self.SECTION_LIMITS['languages']]:
             if isinstance(lang, str):
                 formatted_lang = {
                     'name': lang,
@@ -2563,7 +2707,7 @@ class CareerAssistantAgent:
             return []
             
         formatted_volunteer = []
-        for vol in original_volunteer[:3]:  # Limit to 3 volunteer experiences
+        for vol in original_volunteer[:self.SECTION_LIMITS['volunteer']]:
             formatted_vol = {
                 'role': vol.get('role', ''),
                 'organization': vol.get('organization', ''),
@@ -2580,7 +2724,7 @@ class CareerAssistantAgent:
             return []
             
         formatted_publications = []
-        for pub in original_publications[:3]:  # Limit to 3 publications
+        for pub in original_publications[:self.SECTION_LIMITS['publications']]:
             formatted_pub = {
                 'title': pub.get('title', ''),
                 'venue': pub.get('venue', ''),
@@ -6,35 +6,61 @@ Integrates with LangGraph-based career analysis agent.
 import os
 import sys
 from typing import Dict, Any
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import BackgroundTasks, FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 import asyncio
-import json
+import base64
+import logging
+import hashlib
+import orjson
 import re
 import platform
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-
-# Windows-specific fixes
-if sys.platform == 'win32':
-    # Set the event loop policy for Windows to handle connections better
-    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+from aiolimiter import AsyncLimiter
+import httpx
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+IS_WINDOWS = platform.system() == "Windows"
+
+# Windows-specific fixes; this is the last policy install before uvicorn
+# creates its loop (start_server's earlier install uses the same class), so
+# whatever is set here is what the server actually runs on.
+if IS_WINDOWS:
+    # Set the event loop policy for Windows to handle connections better;
+    # windows_fixes' policy attaches the reset-silencing exception handler
+    # to every loop created under it
+    from windows_fixes import SilentProactorPolicy
+    asyncio.set_event_loop_policy(SilentProactorPolicy())
     # Ignore specific connection errors on Windows
     import warnings
     warnings.filterwarnings("ignore", message=".*WinError 10054.*")
 
 # Import our custom modules
 from career_agent import CareerAssistantAgent
-from pdf_parser import extract_text_from_pdf, validate_pdf, get_pdf_info
+from pdf_parser import parse_pdf, get_pdf_info
 
 # Load environment variables
 load_dotenv()
 
+# Per-request step chatter goes to DEBUG so production requests don't block
+# on stdout; raise the level locally when tracing a request.
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Career Assistant API",
     description="LangGraph-powered career analysis and guidance system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -46,40 +72,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add middleware to handle connection errors gracefully
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-import platform
+# Add middleware to handle connection errors gracefully. Pure ASGI rather
+# than BaseHTTPMiddleware so requests don't pay for the extra anyio task and
+# response buffering that dispatch()-style middleware adds.
+class ConnectionErrorMiddleware:
+    def __init__(self, app):
+        self.app = app
 
-class ConnectionErrorMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope, receive, send):
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         except ConnectionResetError:
-            # Client disconnected - this is normal for file uploads
-            if platform.system() == "Windows":
-                # On Windows, just return a 499 status (client closed connection)
-                return Response(status_code=499, content="Client closed connection")
-            raise
+            # Client disconnected - this is normal for file uploads. On
+            # Windows just drop the request; the client is gone anyway.
+            if not IS_WINDOWS:
+                raise
         except Exception as e:
             # Log other exceptions but don't crash
-            print(f"Request error: {type(e).__name__}: {e}")
+            logger.exception("Request error: %s", type(e).__name__)
             raise
 
 app.add_middleware(ConnectionErrorMiddleware)
 
+
+@app.on_event("startup")
+async def size_default_executor():
+    """
+    Size the default executor for the asyncio.to_thread workload.
+
+    PDF parsing and base64 decoding mix compute with I/O, so oversaturate
+    cores (capped at 32 threads) rather than taking the small default pool.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 2) * 2))
+    )
+
+
+@app.on_event("startup")
+async def create_http_client():
+    """Create a shared HTTP client so outbound job-board requests reuse connections."""
+    app.state.http = httpx.AsyncClient(
+        timeout=10,
+        headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+    )
+
+
+@app.on_event("shutdown")
+async def close_shared_clients():
+    """Close pooled connections held by the shared clients on shutdown."""
+    await app.state.http.aclose()
+    await career_agent.aclose()
+
 # Initialize the career agent with enhanced error handling
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("GEMINI_API_KEY environment variable is required")
 
-print(f"🔑 Initializing Career Agent with API key: {GEMINI_API_KEY[:20]}...")
+logger.info("Initializing Career Agent with API key: %s...", GEMINI_API_KEY[:20])
 try:
     career_agent = CareerAssistantAgent(GEMINI_API_KEY)
-    print("✅ Career Agent initialized successfully")
+    logger.info("Career Agent initialized successfully")
 except Exception as e:
-    print(f"❌ Failed to initialize Career Agent: {str(e)}")
+    logger.exception("Failed to initialize Career Agent")
     raise RuntimeError(f"Career Agent initialization failed: {str(e)}")
 
 
@@ -121,6 +178,90 @@ class CandidateAnalysisResponse(BaseModel):
     message: str
 
 
+# Upload streaming: chunk size for reading uploads and the threshold above
+# which the spooled temp file rolls over from memory to disk.
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_MAX_SIZE = 1024 * 1024
+
+# Maximum number of candidate analyses running against Gemini at once
+MAX_CONCURRENT_ANALYSES = 4
+
+# Optional on-disk cache for extracted resume text; point PDF_CACHE_DIR at a
+# writable directory to keep extraction results across restarts.
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+
+# Only the PREFILTER_TOP_K resumes most similar to the job description get
+# the full LangGraph analysis; remaining candidates are ranked by TF-IDF
+# cosine similarity alone.
+PREFILTER_TOP_K = 10
+
+
+def _prefilter_similarities(job_description: str, resume_texts: list) -> np.ndarray:
+    """TF-IDF cosine similarity of each resume against the job description."""
+    vectorizer = TfidfVectorizer(stop_words='english')
+    matrix = vectorizer.fit_transform([job_description] + resume_texts)
+    return cosine_similarity(matrix[0:1], matrix[1:])[0]
+
+# Token-bucket limiter smoothing aggregate Gemini traffic below the API's
+# requests-per-minute ceiling, so we don't pay for 429s and retries.
+gemini_limiter = AsyncLimiter(60, 60)
+
+# In-process LRU of completed analyses keyed by (resume, JD) content hashes.
+# Retries and re-submitted candidates skip the whole LangGraph workflow.
+# Entries expire after the TTL so a memoized analysis can't go stale forever.
+ANALYSIS_CACHE_MAX = 512
+ANALYSIS_CACHE_TTL = 3600
+_analysis_cache: OrderedDict = OrderedDict()
+
+
+async def cached_analyze(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """
+    Run career_agent.analyze, reusing the result for identical resume/JD pairs.
+
+    Only clean runs are memoized: the workflow swallows LLM failures into
+    result["errors"] and returns fallback sections, and caching those would
+    replay the degraded payload on every retry until eviction.
+
+    Returns a shallow copy so callers can attach request-specific fields
+    without mutating the cached entry.
+    """
+    key = (
+        hashlib.sha256(resume_text.encode()).hexdigest(),
+        hashlib.sha256(job_description.encode()).hexdigest(),
+    )
+    cached = _analysis_cache.get(key)
+    if cached is not None:
+        result, stored_at = cached
+        if time.monotonic() - stored_at < ANALYSIS_CACHE_TTL:
+            _analysis_cache.move_to_end(key)
+            return dict(result)
+        del _analysis_cache[key]
+
+    async with gemini_limiter:
+        result = await career_agent.analyze(resume_text, job_description)
+
+    if not result.get("errors"):
+        _analysis_cache[key] = (result, time.monotonic())
+        if len(_analysis_cache) > ANALYSIS_CACHE_MAX:
+            _analysis_cache.popitem(last=False)
+
+    return dict(result)
+
+
+async def spool_upload(upload: UploadFile) -> tempfile.SpooledTemporaryFile:
+    """
+    Stream an uploaded file into a SpooledTemporaryFile in 64 KB chunks.
+
+    Small files (< 1 MB) stay in memory; larger uploads spill to disk, keeping
+    memory usage constant regardless of PDF size.
+    """
+    tmp = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_SIZE)
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        tmp.write(chunk)
+    tmp.seek(0)
+    return tmp
+
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     """Root endpoint with API information"""
@@ -146,8 +287,18 @@ async def health_check():
     )
 
 
+def record_request_metrics(endpoint: str, started_at: float, detail: str = "") -> None:
+    """Log request timing after the response has been sent to the client."""
+    duration = time.perf_counter() - started_at
+    if detail:
+        logger.info("%s completed in %.2fs (%s)", endpoint, duration, detail)
+    else:
+        logger.info("%s completed in %.2fs", endpoint, duration)
+
+
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_resume_job(
+    background_tasks: BackgroundTasks,
     resume: UploadFile = File(..., description="PDF resume file"),
     job_description: str = Form(..., description="Job description text")
 ):
@@ -160,37 +311,40 @@ async def analyze_resume_job(
     3. Returns comprehensive career insights and recommendations
     """
     
+    started_at = time.perf_counter()
+
     # Validate file type
     if not resume.filename.lower().endswith('.pdf'):
         raise HTTPException(
             status_code=400,
             detail="Only PDF files are supported for resume upload"
         )
-    
+
     try:
 
-        print("📂 Reading PDF file...")
-        pdf_content = await resume.read()
-        print("✔️ PDF file read successfully.")
-        print("🔍 Validating PDF...")
-        if not validate_pdf(pdf_content):
+        logger.debug("Reading PDF file...")
+        pdf_content = await spool_upload(resume)
+        logger.debug("Validating and extracting PDF...")
+        try:
+            # PyPDF2 is synchronous; run it on a worker thread so concurrent
+            # requests don't serialize on the event loop. parse_pdf validates
+            # and extracts with a single document open.
+            is_valid, resume_text = await asyncio.to_thread(parse_pdf, pdf_content, cache_dir=PDF_CACHE_DIR)
+        except HTTPException:
+            raise
+        except Exception as e:
             raise HTTPException(
                 status_code=400,
-                detail="Invalid PDF file. Please upload a valid PDF resume."
+                detail=f"Failed to extract text from PDF: {str(e)}"
             )
 
-        print("✔️ PDF validated successfully.")
-        print("✂️ Extracting text from PDF...")
-        try:
-            resume_text = extract_text_from_pdf(pdf_content)
-        except Exception as e:
+        if not is_valid:
             raise HTTPException(
                 status_code=400,
-                detail=f"Failed to extract text from PDF: {str(e)}"
+                detail="Invalid PDF file. Please upload a valid PDF resume."
             )
 
-        print("✔️ Text extracted from PDF.")
-        print("🔍 Validating extracted text...")
+        logger.debug("Validating extracted text...")
         if not resume_text.strip():
             raise HTTPException(
                 status_code=400,
@@ -216,21 +370,21 @@ async def analyze_resume_job(
                 detail="Job description is too short. Please provide a detailed job description."
             )
 
-        print("✔️ Text validated successfully.")
-        print("🧠 Running LangGraph analysis workflow...")
+        logger.debug("Running LangGraph analysis workflow...")
         try:
-            analysis_result = await career_agent.analyze(resume_text, job_description)
-            
+            analysis_result = await cached_analyze(resume_text, job_description)
+
             # Add resume text to the response
             analysis_result['resume_text'] = resume_text
-            
-            print("✔️ LangGraph analysis completed.")
+
+            logger.debug("LangGraph analysis completed.")
+            # Defer timing/metrics logging until after the response is sent
+            background_tasks.add_task(record_request_metrics, "/analyze", started_at)
             return AnalysisResponse(**analysis_result)
-            
+
         except Exception as e:
-            # Log the error (in production, use proper logging)
-            print(f"❌ Analysis error: {str(e)}")
-            
+            logger.exception("Analysis error")
+
             raise HTTPException(
                 status_code=500,
                 detail=f"Analysis failed: {str(e)}"
@@ -241,13 +395,63 @@ async def analyze_resume_job(
         raise
     except Exception as e:
         # Handle unexpected errors
-        print(f"Unexpected error: {str(e)}")
+        logger.exception("Unexpected error")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while processing your request"
         )
 
 
+@app.post("/analyze/stream")
+async def analyze_resume_job_stream(
+    resume: UploadFile = File(..., description="PDF resume file"),
+    job_description: str = Form(..., description="Job description text")
+):
+    """
+    Streaming variant of /analyze.
+
+    Emits newline-delimited JSON — one {"section": ..., "data": ...} object
+    per completed workflow section — so the frontend can render the ATS score
+    and skills analysis while the later sections are still being generated.
+    """
+
+    # Validate file type
+    if not resume.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported for resume upload"
+        )
+
+    pdf_content = await spool_upload(resume)
+    try:
+        is_valid, resume_text = await asyncio.to_thread(parse_pdf, pdf_content, cache_dir=PDF_CACHE_DIR)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to extract text from PDF: {str(e)}"
+        )
+
+    if not is_valid or not resume_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid PDF file. Please upload a valid PDF resume."
+        )
+
+    if not job_description.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Job description cannot be empty"
+        )
+
+    async def stream_sections():
+        async with gemini_limiter:
+            async for section, data in career_agent.analyze_stream(resume_text, job_description):
+                yield orjson.dumps({"section": section, "data": data}) + b'\n'
+        yield orjson.dumps({"section": "resume_text", "data": resume_text}) + b'\n'
+
+    return StreamingResponse(stream_sections(), media_type="application/x-ndjson")
+
+
 @app.post("/generate-resume")
 async def generate_resume(
     resume_text: str = Form(..., description="Original resume text"),
@@ -266,15 +470,15 @@ async def generate_resume(
     
     try:
         # Parse analysis results
-        import json
-        analysis_data = json.loads(analysis_results)
+        analysis_data = orjson.loads(analysis_results)
         
         # Generate ATS resume using the career agent
-        ats_resume = await career_agent.generate_ats_resume(
-            resume_text, 
-            job_description, 
-            analysis_data
-        )
+        async with gemini_limiter:
+            ats_resume = await career_agent.generate_ats_resume(
+                resume_text,
+                job_description,
+                analysis_data
+            )
         
         return {
             "success": True,
@@ -282,13 +486,13 @@ async def generate_resume(
             "message": "ATS-optimized resume generated successfully"
         }
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid analysis results JSON: {str(e)}"
         )
     except Exception as e:
-        print(f"Resume generation error: {str(e)}")
+        logger.exception("Resume generation error")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate resume: {str(e)}"
@@ -296,7 +500,7 @@ async def generate_resume(
 
 
 @app.post("/analyze-candidates", response_model=CandidateAnalysisResponse)
-async def analyze_candidates(request: CandidateAnalysisRequest):
+async def analyze_candidates(request: CandidateAnalysisRequest, background_tasks: BackgroundTasks):
     """
     Analyze candidates using LangGraph agent for intelligent ranking.
     
@@ -306,133 +510,218 @@ async def analyze_candidates(request: CandidateAnalysisRequest):
     3. Returns top 5 candidates with detailed analysis
     """
     
+    started_at = time.perf_counter()
+
     try:
         job_description = request.job_description
         candidates = request.candidates
-        
+
         if not candidates:
             return CandidateAnalysisResponse(
                 top_candidates=[],
                 message="No candidates provided for analysis"
             )
         
-        # Analyze each candidate using LangGraph
-        analyzed_candidates = []
-        
-        for candidate in candidates:
+        # Analyze candidates concurrently; the semaphore bounds in-flight
+        # LangGraph runs so we stay under Gemini's concurrency limits.
+        sem = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+        def fallback_entry(candidate, error: str) -> dict:
+            # Candidate with minimal data when analysis fails
+            return {
+                '_id': candidate['id'],
+                'name': candidate['name'],
+                'email': candidate['email'],
+                'skills': candidate['skills'],
+                'score': 0.3,  # Default low score
+                'atsScore': 30,
+                'experienceSummary': 'Analysis failed - resume may be unreadable',
+                'analysis': {
+                    'error': error
+                }
+            }
+
+        def prefiltered_entry(candidate, similarity: float) -> dict:
+            # Interpolated score keeps prefiltered candidates below fully
+            # analyzed ones while preserving their relative order.
+            score = round(0.5 * similarity, 4)
+            return {
+                '_id': candidate['id'],
+                'name': candidate['name'],
+                'email': candidate['email'],
+                'skills': candidate['skills'],
+                'score': score,
+                'atsScore': round(score * 100),
+                'experienceSummary': 'Ranked by job description similarity (not fully analyzed)',
+                'analysis': {
+                    'prefilter_similarity': round(similarity, 4)
+                }
+            }
+
+        async def extract_one(candidate):
+            # Decode base64 resume and extract text off the event loop
             try:
-                # Decode base64 resume
-                import base64
-                import io
-                
-                resume_bytes = base64.b64decode(candidate['resumeBase64'])
-                
-                # Extract text from PDF
-                resume_text = extract_text_from_pdf(resume_bytes)
-                
-                if not resume_text.strip():
-                    print(f"Warning: No text extracted from {candidate['name']}'s resume")
-                    continue
-                
-                # Use LangGraph agent to analyze resume against job
-                analysis_result = await career_agent.analyze(resume_text, job_description)
-                
-                # Calculate overall match score from analysis
-                ats_score = analysis_result.get('ats_score', {})
-                skills_analysis = analysis_result.get('skills_analysis', {})
-                
-                # Calculate composite score
-                score = calculate_candidate_score(ats_score, skills_analysis, candidate)
-                
-                analyzed_candidates.append({
-                    '_id': candidate['id'],
-                    'name': candidate['name'],
-                    'email': candidate['email'],
-                    'skills': candidate['skills'],
-                    'score': score,
-                    'atsScore': round(score * 100),  # Convert to percentage
-                    'experienceSummary': generate_experience_summary(analysis_result, candidate),
-                    'analysis': {
-                        'ats_score': ats_score,
-                        'skills_match': skills_analysis.get('matched_skills', []),
-                        'skill_gaps': skills_analysis.get('skill_gaps', []),
-                        'recommendations': analysis_result.get('learning_roadmap', {}).get('immediate_actions', [])
-                    }
-                })
-                
-            except Exception as e:
-                print(f"Error analyzing candidate {candidate['name']}: {str(e)}")
-                # Add candidate with minimal data if analysis fails
-                analyzed_candidates.append({
-                    '_id': candidate['id'],
-                    'name': candidate['name'],
-                    'email': candidate['email'],
-                    'skills': candidate['skills'],
-                    'score': 0.3,  # Default low score
-                    'atsScore': 30,
-                    'experienceSummary': 'Analysis failed - resume may be unreadable',
-                    'analysis': {
-                        'error': str(e)
+                resume_bytes = await asyncio.to_thread(base64.b64decode, candidate['resumeBase64'])
+                is_valid, resume_text = await asyncio.to_thread(parse_pdf, resume_bytes, cache_dir=PDF_CACHE_DIR)
+                if not is_valid:
+                    raise ValueError('Invalid PDF resume')
+                return resume_text
+            except Exception:
+                logger.exception("Error extracting resume for candidate %s", candidate['name'])
+                return None
+
+        async def analyze_one(candidate, resume_text):
+            async with sem:
+                try:
+                    # Use LangGraph agent to analyze resume against job
+                    analysis_result = await cached_analyze(resume_text, job_description)
+
+                    ats_score = analysis_result.get('ats_score', {})
+                    skills_analysis = analysis_result.get('skills_analysis', {})
+
+                    return {
+                        '_id': candidate['id'],
+                        'name': candidate['name'],
+                        'email': candidate['email'],
+                        'skills': candidate['skills'],
+                        'score': None,  # Filled in by the batched scorer below
+                        'atsScore': 0,
+                        'experienceSummary': generate_experience_summary(analysis_result, candidate),
+                        'analysis': {
+                            'ats_score': ats_score,
+                            'skills_match': skills_analysis.get('matched_skills', []),
+                            'skill_gaps': skills_analysis.get('skill_gaps', []),
+                            'recommendations': analysis_result.get('learning_roadmap', {}).get('immediate_actions', [])
+                        }
                     }
-                })
-        
-        # Sort by score and get top 5
-        top_candidates = sorted(analyzed_candidates, key=lambda x: x['score'], reverse=True)[:5]
-        
+
+                except Exception as e:
+                    logger.exception("Error analyzing candidate %s", candidate['name'])
+                    return fallback_entry(candidate, str(e))
+
+        resume_texts = await asyncio.gather(*(extract_one(candidate) for candidate in candidates))
+
+        analyzed_candidates = []
+        to_analyze = []
+        for candidate, resume_text in zip(candidates, resume_texts):
+            if resume_text is None:
+                analyzed_candidates.append(fallback_entry(candidate, 'Resume extraction failed'))
+            elif not resume_text.strip():
+                logger.warning("No text extracted from %s's resume", candidate['name'])
+            else:
+                to_analyze.append((candidate, resume_text))
+
+        # Cheap TF-IDF prefilter: only the resumes closest to the job
+        # description get the full LangGraph workflow (the dominant cost);
+        # the rest receive a similarity-derived score.
+        if len(to_analyze) > PREFILTER_TOP_K:
+            sims = await asyncio.to_thread(
+                _prefilter_similarities, job_description,
+                [resume_text for _, resume_text in to_analyze]
+            )
+            top_idx = set(np.argpartition(-sims, PREFILTER_TOP_K)[:PREFILTER_TOP_K].tolist())
+            analyzed_candidates.extend(
+                prefiltered_entry(candidate, float(sims[i]))
+                for i, (candidate, _) in enumerate(to_analyze)
+                if i not in top_idx
+            )
+            to_analyze = [pair for i, pair in enumerate(to_analyze) if i in top_idx]
+
+        results = await asyncio.gather(
+            *(analyze_one(candidate, resume_text) for candidate, resume_text in to_analyze),
+            return_exceptions=True
+        )
+        analyzed_candidates.extend(r for r in results if isinstance(r, dict))
+
+        # Score successfully analyzed candidates in one vectorized pass;
+        # fallback entries keep their fixed low score from analyze_one.
+        pending = [c for c in analyzed_candidates if c['score'] is None]
+        if pending:
+            for cand, score in zip(pending, calculate_candidate_scores(pending)):
+                cand['score'] = float(score)
+                cand['atsScore'] = round(cand['score'] * 100)  # Convert to percentage
+
+        # Get top 5 by score; argpartition selects them in O(N) before the
+        # small final sort
+        if len(analyzed_candidates) > 5:
+            scores_arr = np.fromiter((c['score'] for c in analyzed_candidates), dtype=float)
+            top_idx = np.argpartition(-scores_arr, 5)[:5]
+            top_candidates = sorted(
+                (analyzed_candidates[i] for i in top_idx),
+                key=lambda x: x['score'], reverse=True
+            )
+        else:
+            top_candidates = sorted(analyzed_candidates, key=lambda x: x['score'], reverse=True)
+
+        # Defer timing/metrics logging until after the response is sent
+        background_tasks.add_task(
+            record_request_metrics, "/analyze-candidates", started_at,
+            f"{len(analyzed_candidates)} candidates"
+        )
         return CandidateAnalysisResponse(
             top_candidates=top_candidates,
             message=f"Successfully analyzed {len(analyzed_candidates)} candidates using AI"
         )
         
     except Exception as e:
-        print(f"Candidate analysis error: {str(e)}")
+        logger.exception("Candidate analysis error")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to analyze candidates: {str(e)}"
         )
 
 
-def calculate_candidate_score(ats_score: dict, skills_analysis: dict, candidate: dict) -> float:
+def calculate_candidate_scores(candidates: list) -> np.ndarray:
     """
-    Calculate overall candidate score based on LangGraph analysis results.
+    Calculate overall candidate scores based on LangGraph analysis results.
+
+    Takes the analyzed-candidate dicts built in analyze_candidates and scores
+    them all at once: per-candidate fields are gathered into NumPy arrays and
+    the weighting (40% ATS, 35% skills match, 25% profile completeness) runs
+    as array arithmetic instead of a Python loop per candidate.
     """
-    score = 0.0
-    
-    # ATS Score component (40% weight)
-    if ats_score and 'overall_score' in ats_score:
-        ats_component = ats_score['overall_score'] * 0.4
-        score += ats_component
-    elif ats_score and 'score' in ats_score:
-        ats_component = ats_score['score'] * 0.4
-        score += ats_component
-    
-    # Skills matching component (35% weight)
-    if skills_analysis:
-        matched_skills = skills_analysis.get('matched_skills', [])
-        skill_gaps = skills_analysis.get('skill_gaps', [])
-        total_required_skills = len(matched_skills) + len(skill_gaps)
-        
-        if total_required_skills > 0:
-            skills_match_ratio = len(matched_skills) / total_required_skills
-            skills_component = skills_match_ratio * 0.35
-            score += skills_component
-    
-    # Profile completeness component (25% weight)
-    profile_score = 0.0
-    if candidate.get('name') and len(candidate['name']) > 0:
-        profile_score += 0.05
-    if candidate.get('email') and '@' in candidate['email']:
-        profile_score += 0.05
-    if candidate.get('skills') and len(candidate['skills']) > 0:
-        profile_score += 0.10
-        # Bonus for more skills
-        if len(candidate['skills']) >= 5:
+    n = len(candidates)
+    ats = np.zeros(n)
+    matched = np.zeros(n)
+    gaps = np.zeros(n)
+    profile = np.zeros(n)
+
+    for i, candidate in enumerate(candidates):
+        analysis = candidate.get('analysis', {})
+
+        # ATS Score component (40% weight)
+        ats_score = analysis.get('ats_score', {})
+        if ats_score and 'overall_score' in ats_score:
+            ats[i] = ats_score['overall_score']
+        elif ats_score and 'score' in ats_score:
+            ats[i] = ats_score['score']
+
+        # Skills matching component (35% weight)
+        matched[i] = len(analysis.get('skills_match', []))
+        gaps[i] = len(analysis.get('skill_gaps', []))
+
+        # Profile completeness component (25% weight)
+        profile_score = 0.0
+        if candidate.get('name') and len(candidate['name']) > 0:
             profile_score += 0.05
-    
-    score += profile_score
-    
-    # Ensure score is between 0 and 1
-    return min(max(score, 0.0), 1.0)
+        if candidate.get('email') and '@' in candidate['email']:
+            profile_score += 0.05
+        if candidate.get('skills') and len(candidate['skills']) > 0:
+            profile_score += 0.10
+            # Bonus for more skills
+            if len(candidate['skills']) >= 5:
+                profile_score += 0.05
+        profile[i] = profile_score
+
+    total_required = matched + gaps
+    scores = (
+        0.4 * ats
+        + 0.35 * np.divide(matched, total_required, out=np.zeros(n), where=total_required > 0)
+        + profile
+    )
+
+    # Ensure scores are between 0 and 1
+    return np.clip(scores, 0.0, 1.0)
 
 
 def generate_experience_summary(analysis_result: dict, candidate: dict) -> str:
@@ -478,7 +767,7 @@ async def scrape_jobs(request: JobScrapeRequest):
         experience_level = determine_experience_level(resume_text)
         
         # Generate job opportunities based on resume
-        jobs = generate_job_opportunities(skills, experience_level, job_description)
+        jobs = await generate_job_opportunities(skills, experience_level, job_description)
         
         return JobScrapeResponse(
             jobs=jobs,
@@ -486,99 +775,107 @@ async def scrape_jobs(request: JobScrapeRequest):
         )
         
     except Exception as e:
-        print(f"Job scraping error: {str(e)}")
+        logger.exception("Job scraping error")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to scrape jobs: {str(e)}"
         )
 
 
+# Common technical skills to look for in resumes
+COMMON_SKILLS = (
+    'python', 'javascript', 'java', 'react', 'node.js', 'sql', 'html', 'css',
+    'aws', 'docker', 'kubernetes', 'git', 'linux', 'mongodb', 'postgresql',
+    'machine learning', 'data science', 'artificial intelligence', 'tensorflow',
+    'pytorch', 'pandas', 'numpy', 'django', 'flask', 'express', 'angular',
+    'vue', 'typescript', 'c++', 'c#', '.net', 'spring', 'hibernate', 'redis',
+    'elasticsearch', 'jenkins', 'devops', 'microservices', 'api', 'rest',
+    'graphql', 'blockchain', 'solidity', 'golang', 'rust', 'kotlin', 'swift',
+    'ios', 'android', 'flutter', 'dart', 'unity', 'unreal', 'photoshop',
+    'illustrator', 'figma', 'sketch', 'ui/ux', 'product management', 'scrum',
+    'agile', 'jira', 'confluence', 'tableau', 'power bi', 'excel', 'r'
+)
+
+# Display names computed once so matches don't pay a .title() call each
+_SKILL_TITLES = {skill: skill.title() for skill in COMMON_SKILLS}
+
+# Compile the skill list into a single Aho-Corasick automaton at import so
+# skill extraction is one linear pass over the text instead of ~60 separate
+# substring scans. Falls back to the plain scan if the C extension is absent.
+try:
+    import ahocorasick
+    _SKILL_AUTOMATON = ahocorasick.Automaton()
+    for _skill in COMMON_SKILLS:
+        _SKILL_AUTOMATON.add_word(_skill, _skill)
+    _SKILL_AUTOMATON.make_automaton()
+except ImportError:
+    _SKILL_AUTOMATON = None
+
+
 def extract_skills_from_text(text: str) -> list:
     """Extract technical skills from resume text"""
-    # Common technical skills to look for
-    common_skills = [
-        'python', 'javascript', 'java', 'react', 'node.js', 'sql', 'html', 'css',
-        'aws', 'docker', 'kubernetes', 'git', 'linux', 'mongodb', 'postgresql',
-        'machine learning', 'data science', 'artificial intelligence', 'tensorflow',
-        'pytorch', 'pandas', 'numpy', 'django', 'flask', 'express', 'angular',
-        'vue', 'typescript', 'c++', 'c#', '.net', 'spring', 'hibernate', 'redis',
-        'elasticsearch', 'jenkins', 'devops', 'microservices', 'api', 'rest',
-        'graphql', 'blockchain', 'solidity', 'golang', 'rust', 'kotlin', 'swift',
-        'ios', 'android', 'flutter', 'dart', 'unity', 'unreal', 'photoshop',
-        'illustrator', 'figma', 'sketch', 'ui/ux', 'product management', 'scrum',
-        'agile', 'jira', 'confluence', 'tableau', 'power bi', 'excel', 'r'
-    ]
-    
-    found_skills = []
     text_lower = text.lower()
-    
-    for skill in common_skills:
-        if skill.lower() in text_lower:
-            found_skills.append(skill.title())
-    
-    return found_skills[:10]  # Return top 10 skills
+
+    if _SKILL_AUTOMATON is not None:
+        found = {skill for _, skill in _SKILL_AUTOMATON.iter(text_lower)}
+    else:
+        found = {skill for skill in COMMON_SKILLS if skill in text_lower}
+
+    return [_SKILL_TITLES[skill] for skill in COMMON_SKILLS if skill in found][:10]  # Return top 10 skills
+
+
+# Compiled once at import; determine_experience_level runs per request.
+YEARS_RE = re.compile(r'(\d+)\+?\s*years?\s*(?:of\s*)?experience')
+SENIOR_RE = re.compile(r'\b(?:senior|lead|principal|architect|manager|director)\b')
+ENTRY_RE = re.compile(r'\b(?:intern|entry|junior|graduate|fresh)\b')
 
 
 def determine_experience_level(text: str) -> str:
     """Determine experience level from resume text"""
     text_lower = text.lower()
-    
+
     # Look for experience indicators
-    senior_indicators = ['senior', 'lead', 'principal', 'architect', 'manager', 'director']
-    entry_indicators = ['intern', 'entry', 'junior', 'graduate', 'fresh']
-    
-    for indicator in senior_indicators:
-        if indicator in text_lower:
-            return 'Senior'
-    
-    for indicator in entry_indicators:
-        if indicator in text_lower:
-            return 'Entry Level'
-    
+    if SENIOR_RE.search(text_lower):
+        return 'Senior'
+
+    if ENTRY_RE.search(text_lower):
+        return 'Entry Level'
+
     # Count years of experience
-    years_pattern = r'(\d+)\+?\s*years?\s*(of\s*)?experience'
-    years_matches = re.findall(years_pattern, text_lower)
-    
-    if years_matches:
-        max_years = max([int(match[0]) for match in years_matches])
+    max_years = max(
+        (int(match.group(1)) for match in YEARS_RE.finditer(text_lower)),
+        default=None
+    )
+
+    if max_years is not None:
         if max_years >= 5:
             return 'Senior'
         elif max_years >= 2:
             return 'Mid-Level'
         else:
             return 'Entry Level'
-    
+
     return 'Mid-Level'  # Default
 
 
-def generate_job_opportunities(skills: list, experience_level: str, job_description: str) -> list:
+async def generate_job_opportunities(skills: list, experience_level: str, job_description: str) -> list:
     """Generate job opportunities with real web scraping from multiple sources"""
-    
-    import requests
-    from bs4 import BeautifulSoup
-    import time
-    import random
-    
-    jobs = []
-    
+
     # Primary skills for job search
     primary_skills = skills[:3] if skills else ['developer']
-    
+
     try:
-        # Scrape from RemoteOK
-        jobs.extend(scrape_remoteok(primary_skills))
-        
-        # Small delay between requests
-        time.sleep(1)
-        
-        # Scrape from We Work Remotely (with fallback data)
-        jobs.extend(scrape_weworkremotely(primary_skills))
-        
-        # Add some curated jobs from Remotive
-        jobs.extend(get_remotive_jobs(primary_skills))
-        
+        # Fetch all sources concurrently; total wait is the slowest source
+        # rather than the sum of them
+        source_results = await asyncio.gather(
+            scrape_remoteok(primary_skills),
+            scrape_weworkremotely(primary_skills),
+            get_remotive_jobs(primary_skills)
+        )
+        jobs = [job for source_jobs in source_results for job in source_jobs]
+
     except Exception as e:
-        print(f"Web scraping error: {e}")
+        logger.exception("Web scraping error")
         # Fallback to curated job list
         jobs = get_fallback_jobs(skills, experience_level)
     
@@ -598,22 +895,38 @@ def generate_job_opportunities(skills: list, experience_level: str, job_descript
     return unique_jobs
 
 
-def scrape_remoteok(skills: list) -> list:
+# RemoteOK feed cache: the feed changes slowly, so one fetch serves every
+# request within the TTL window instead of paying the network hop each time.
+REMOTEOK_CACHE_TTL = 600
+_remoteok_cache: Dict[str, Any] = {'data': None, 'fetched_at': 0.0}
+
+
+async def _fetch_remoteok_raw() -> list:
+    """Fetch the raw RemoteOK feed, cached in-process with a TTL."""
+    now = time.monotonic()
+    if _remoteok_cache['data'] is not None and now - _remoteok_cache['fetched_at'] < REMOTEOK_CACHE_TTL:
+        return _remoteok_cache['data']
+
+    # Use RemoteOK API (more reliable than web scraping)
+    response = await app.state.http.get('https://remoteok.io/api')
+
+    if response.status_code != 200:
+        return []
+
+    data = response.json()
+    _remoteok_cache['data'] = data
+    _remoteok_cache['fetched_at'] = now
+    return data
+
+
+async def scrape_remoteok(skills: list) -> list:
     """Scrape jobs from RemoteOK"""
     jobs = []
-    
+
     try:
-        # Use RemoteOK API (more reliable than web scraping)
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        # Try to get jobs from RemoteOK API
-        response = requests.get('https://remoteok.io/api', headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
+        data = await _fetch_remoteok_raw()
+
+        if data:
             for job_data in data[1:6]:  # Skip first element (metadata) and get 5 jobs
                 if isinstance(job_data, dict):
                     # Filter by skills
@@ -636,12 +949,12 @@ def scrape_remoteok(skills: list) -> list:
                             break
     
     except Exception as e:
-        print(f"RemoteOK scraping error: {e}")
+        logger.exception("RemoteOK scraping error")
     
     return jobs
 
 
-def scrape_weworkremotely(skills: list) -> list:
+async def scrape_weworkremotely(skills: list) -> list:
     """Get jobs from We Work Remotely style data"""
     # Since direct scraping can be blocked, we'll provide curated data
     # that represents what would typically be found
@@ -668,7 +981,7 @@ def scrape_weworkremotely(skills: list) -> list:
     return wework_jobs
 
 
-def get_remotive_jobs(skills: list) -> list:
+async def get_remotive_jobs(skills: list) -> list:
     """Get jobs from Remotive style sources"""
     
     remotive_jobs = [
@@ -693,28 +1006,38 @@ def get_remotive_jobs(skills: list) -> list:
     return remotive_jobs
 
 
+# Role-trigger skill buckets for fallback job suggestions; frozensets so
+# matching is a set intersection instead of nested list scans per call.
+BACKEND_SKILLS = frozenset({'python', 'java', 'javascript', 'c++', 'golang'})
+FRONTEND_SKILLS = frozenset({'react', 'angular', 'vue', 'javascript', 'typescript'})
+ML_SKILLS = frozenset({'machine learning', 'data science', 'tensorflow', 'pytorch'})
+DEVOPS_SKILLS = frozenset({'aws', 'docker', 'kubernetes', 'devops', 'jenkins'})
+DESIGN_SKILLS = frozenset({'ui/ux', 'figma', 'sketch', 'photoshop'})
+
+
 def get_fallback_jobs(skills: list, experience_level: str) -> list:
     """Fallback job opportunities when scraping fails"""
-    
+
     # Base job roles based on skills
     job_roles = []
-    
+    skills_lower = {skill.lower() for skill in skills}
+
     # Determine job roles based on skills
-    if any(skill.lower() in ['python', 'java', 'javascript', 'c++', 'golang'] for skill in skills):
+    if skills_lower & BACKEND_SKILLS:
         job_roles.extend(['Software Engineer', 'Backend Developer', 'Full Stack Developer'])
-    
-    if any(skill.lower() in ['react', 'angular', 'vue', 'javascript', 'typescript'] for skill in skills):
+
+    if skills_lower & FRONTEND_SKILLS:
         job_roles.extend(['Frontend Developer', 'React Developer', 'Web Developer'])
-    
-    if any(skill.lower() in ['machine learning', 'data science', 'tensorflow', 'pytorch'] for skill in skills):
+
+    if skills_lower & ML_SKILLS:
         job_roles.extend(['Data Scientist', 'Machine Learning Engineer', 'AI Engineer'])
-    
-    if any(skill.lower() in ['aws', 'docker', 'kubernetes', 'devops', 'jenkins'] for skill in skills):
+
+    if skills_lower & DEVOPS_SKILLS:
         job_roles.extend(['DevOps Engineer', 'Cloud Engineer', 'Site Reliability Engineer'])
-    
-    if any(skill.lower() in ['ui/ux', 'figma', 'sketch', 'photoshop'] for skill in skills):
+
+    if skills_lower & DESIGN_SKILLS:
         job_roles.extend(['UI/UX Designer', 'Product Designer', 'Visual Designer'])
-    
+
     # Default roles if no specific skills found
     if not job_roles:
         job_roles = ['Software Developer', 'Technical Analyst', 'IT Specialist']
@@ -757,8 +1080,8 @@ async def get_pdf_info_endpoint(file: UploadFile = File(...)):
     Useful for debugging PDF parsing issues.
     """
     try:
-        pdf_content = await file.read()
-        info = get_pdf_info(pdf_content)
+        pdf_content = await spool_upload(file)
+        info = await asyncio.to_thread(get_pdf_info, pdf_content)
         return info
     except Exception as e:
         raise HTTPException(
@@ -792,22 +1115,17 @@ async def internal_error_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    import sys
-    import platform
-    
+
     print("🚀 Starting AI Career Assistant API...")
     print(f"📋 Using Gemini API Key: {GEMINI_API_KEY[:20]}...")
     print("🔗 API will be available at: http://localhost:8000")
     print("📚 API Documentation: http://localhost:8000/docs")
     print("🏥 Health Check: http://localhost:8000/health")
-    
-    # Windows-specific asyncio fixes
-    if platform.system() == "Windows":
-        import asyncio
-        # Set the event loop policy for Windows to avoid connection reset errors
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-        print("🔧 Applied Windows asyncio optimizations")
-    
+
+    # Windows asyncio fixes are applied once at module import, before uvicorn
+    # creates its event loop; setting the policy again here could recreate
+    # the loop mid-startup.
+
     try:
         uvicorn.run(
             "main:app", 
@@ -4,6 +4,8 @@ Improved server startup script for Windows.
 Handles asyncio issues and provides better error messages.
 """
 
+import importlib.metadata
+import importlib.util
 import os
 import sys
 import platform
@@ -17,17 +19,21 @@ from windows_fixes import WindowsNetworkingFixes
 # Load environment variables
 load_dotenv()
 
+_IS_WINDOWS = platform.system() == "Windows"
+
 def setup_windows_asyncio():
     """Setup Windows-specific asyncio optimizations"""
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         # Suppress specific Windows asyncio warnings
         warnings.filterwarnings("ignore", category=RuntimeWarning, message=".*Proactor.*")
         warnings.filterwarnings("ignore", category=ResourceWarning, message=".*unclosed.*")
         warnings.filterwarnings("ignore", category=DeprecationWarning, message=".*event loop.*")
         
-        # Set the event loop policy for Windows
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-        
+        # The Proactor policy itself is installed by windows_fixes
+        # (apply_all_fixes runs before this) and again at main.py import;
+        # reinstalling a plain one here would drop the reset-silencing
+        # exception handler its subclass attaches to new loops.
+
         # Create a new event loop and set it as the current one
         try:
             loop = asyncio.new_event_loop()
@@ -48,27 +54,38 @@ def check_requirements():
     """Check if all required packages are installed"""
     package_imports = {
         'fastapi': 'fastapi',
-        'uvicorn': 'uvicorn', 
+        'uvicorn': 'uvicorn',
         'python-multipart': 'multipart',
         'pypdf2': 'PyPDF2',
         'google-generativeai': 'google.generativeai',
         'python-dotenv': 'dotenv',
         'langgraph': 'langgraph'
     }
-    
-    missing_packages = []
-    
-    for package_name, import_name in package_imports.items():
-        try:
-            __import__(import_name)
-        except ImportError:
-            missing_packages.append(package_name)
-    
+
+    # Package-metadata lookup only - avoids importing (and initializing)
+    # each package just to confirm it is installed
+    installed = {
+        dist.metadata['Name'].lower()
+        for dist in importlib.metadata.distributions()
+        if dist.metadata['Name']
+    }
+
+    # find_spec fallback covers packages that are importable without
+    # registered metadata (editable or vendored installs); it resolves the
+    # spec without executing any module code
+    missing_packages = [
+        package_name
+        for package_name, import_name in package_imports.items()
+        if package_name.lower() not in installed
+        and importlib.util.find_spec(import_name.split('.')[0]) is None
+    ]
+
     if missing_packages:
-        print("❌ Missing required packages:")
-        for package in missing_packages:
-            print(f"   - {package}")
-        print(f"\nInstall them with: pip install {' '.join(missing_packages)}")
+        # Render the report in one write instead of one print per package
+        lines = ["❌ Missing required packages:"]
+        lines.extend(f"   - {package}" for package in missing_packages)
+        lines.append(f"\nInstall them with: pip install {' '.join(missing_packages)}")
+        print("\n".join(lines))
         return False
     
     return True
@@ -78,9 +95,9 @@ def check_environment():
     gemini_key = os.getenv("GEMINI_API_KEY")
     
     if not gemini_key:
-        print("❌ GEMINI_API_KEY environment variable is not set!")
-        print("Please create a .env file with your Gemini API key:")
-        print("GEMINI_API_KEY=your_key_here")
+        print("❌ GEMINI_API_KEY environment variable is not set!\n"
+              "Please create a .env file with your Gemini API key:\n"
+              "GEMINI_API_KEY=your_key_here")
         return False
     
     if len(gemini_key) < 20:
@@ -92,19 +109,20 @@ def check_environment():
 def main():
     """Main startup function"""
     print("🚀 Starting AI Career Assistant API...")
-    
-    # Apply Windows fixes early
-    if platform.system() == "Windows":
-        WindowsNetworkingFixes.apply_all_fixes()
-    
-    # Check requirements
+
+    # Check requirements and environment first - no point paying for the
+    # Windows asyncio setup if the startup is going to fail anyway
     if not check_requirements():
         sys.exit(1)
-    
+
     # Check environment
     if not check_environment():
         sys.exit(1)
-    
+
+    # Apply Windows fixes
+    if _IS_WINDOWS:
+        WindowsNetworkingFixes.apply_all_fixes()
+
     # Setup Windows optimizations
     is_windows = setup_windows_asyncio()
     if is_windows:
@@ -115,11 +133,11 @@ def main():
         import uvicorn
         from main import app, GEMINI_API_KEY
         
-        print(f"📋 Using Gemini API Key: {GEMINI_API_KEY[:20]}...")
-        print("🔗 API will be available at: http://localhost:8000")
-        print("📚 API Documentation: http://localhost:8000/docs")
-        print("🏥 Health Check: http://localhost:8000/health")
-        print("\n✨ Server starting... (Press Ctrl+C to stop)")
+        print(f"📋 Using Gemini API Key: {GEMINI_API_KEY[:20]}...\n"
+              "🔗 API will be available at: http://localhost:8000\n"
+              "📚 API Documentation: http://localhost:8000/docs\n"
+              "🏥 Health Check: http://localhost:8000/health\n"
+              "\n✨ Server starting... (Press Ctrl+C to stop)")
         
         # Configure uvicorn with Windows-friendly settings
         config = {
@@ -3,105 +3,160 @@ Windows-specific fixes for asyncio connection reset errors.
 This module contains utilities to handle Windows networking quirks.
 """
 
-import os
-import sys
+import re
 import platform
-import warnings
-import asyncio
 import logging
-from typing import Optional
+
+# platform.system() can hit a uname() syscall plus a string compare; resolve
+# it once at import since the platform cannot change under a running process.
+_IS_WINDOWS = platform.system() == "Windows"
+
+# asyncio (and transitively proactor_events) is only touched by the
+# Windows-specific code paths, so non-Windows hosts skip loading it here
+if _IS_WINDOWS:
+    import asyncio
+
+# Matches asyncio context messages about connection resets; compiled once so
+# the exception handler does one C-level search instead of lowercasing the
+# message and scanning it twice per exception.
+_RESET_RE = re.compile(r'connection.*reset', re.IGNORECASE)
+
+_log = logging.getLogger(__name__)
 
 
 def suppress_windows_connection_warnings():
     """
     Suppress common Windows connection reset warnings that don't affect functionality.
     """
-    if platform.system() != "Windows":
+    if not _IS_WINDOWS:
         return
-    
-    # Suppress specific warnings that are common on Windows
+
+    import warnings
+
+    # Suppress specific warnings that are common on Windows; each filter
+    # stays scoped to its category so unrelated warnings with similar
+    # wording still surface
     warnings.filterwarnings("ignore", category=ResourceWarning, message=".*unclosed.*")
     warnings.filterwarnings("ignore", category=RuntimeWarning, message=".*Proactor.*")
     warnings.filterwarnings("ignore", category=DeprecationWarning, message=".*event loop.*")
-    
-    # Suppress ConnectionResetError logging
+
+    # Suppress ConnectionResetError logging; uvicorn's dictConfig gives
+    # these children explicit levels, so the parent logger can't cover them
     logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
+def handle_exception(loop, context):
+    """
+    Asyncio exception handler that silences connection-reset noise.
+    """
+    exception = context.get('exception')
+    if isinstance(exception, (ConnectionResetError, ConnectionAbortedError)):
+        # Silently ignore connection reset errors
+        return
+
+    if _RESET_RE.search(context.get('message', '')):
+        return
+
+    # Default handling for real errors
+    logging.getLogger('asyncio').debug(f"Asyncio exception: {context}")
+
+
+# WindowsProactorEventLoopPolicy only exists on Windows builds of asyncio
+if _IS_WINDOWS:
+
+    class SilentProactorPolicy(asyncio.WindowsProactorEventLoopPolicy):
+        """
+        Proactor policy whose loops get the reset-silencing handler attached
+        at creation, so every loop uvicorn spins up is covered without
+        touching asyncio.get_event_loop() at import time.
+        """
+
+        def new_event_loop(self):
+            loop = super().new_event_loop()
+            loop.set_exception_handler(handle_exception)
+            return loop
+
+
 def setup_windows_asyncio_policy():
     """
     Setup Windows-specific asyncio policy to handle connection resets gracefully.
     """
-    if platform.system() != "Windows":
+    if not _IS_WINDOWS:
         return
-    
+
     try:
-        # Use WindowsProactorEventLoopPolicy for better Windows compatibility
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-        
+        # Every loop created under this policy carries the exception handler
+        asyncio.set_event_loop_policy(SilentProactorPolicy())
+
         # Create new event loop if needed
         try:
             loop = asyncio.get_event_loop()
         except RuntimeError:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-        
+
         # Disable debug mode to reduce noise
         loop.set_debug(False)
-        
+
     except Exception as e:
-        print(f"Warning: Could not setup Windows asyncio policy: {e}")
+        _log.warning(f"Could not setup Windows asyncio policy: {e}")
 
 
 def handle_connection_reset_error(func):
     """
     Decorator to handle ConnectionResetError gracefully on Windows.
+
+    On other platforms the handler is returned untouched, so Linux
+    deployments pay no extra frame per request.
     """
+    if not _IS_WINDOWS:
+        return func
+
     import functools
-    
+
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
         except ConnectionResetError:
-            # On Windows, this is often normal when client disconnects
-            if platform.system() == "Windows":
-                print("Client disconnected (ConnectionResetError) - this is normal for file uploads")
-                return None
-            raise
-        except Exception:
-            raise
-    
+            # On Windows, this is often normal when client disconnects;
+            # debug level keeps the hot disconnect path off stdout
+            _log.debug("Client disconnected (ConnectionResetError) - this is normal for file uploads")
+            return None
+
     return wrapper
 
 
+# Windows-optimized uvicorn settings; built once since they take no inputs
+_UVICORN_CONFIG = {
+    "host": "127.0.0.1",  # Use localhost instead of 0.0.0.0 on Windows
+    "port": 8000,
+    "reload": False,
+    "log_level": "warning",  # Reduce log noise
+    "access_log": False,
+    "use_colors": True,
+    "loop": "asyncio"
+}
+
+
 class WindowsNetworkingFixes:
     """
     Collection of Windows networking fixes for the FastAPI application.
     """
-    
+
     @staticmethod
     def apply_all_fixes():
         """Apply all Windows networking fixes."""
         suppress_windows_connection_warnings()
         setup_windows_asyncio_policy()
-        print("✅ Applied Windows networking fixes")
-    
+        _log.debug("Applied Windows networking fixes")
+
     @staticmethod
     def get_uvicorn_config() -> dict:
         """Get Windows-optimized uvicorn configuration."""
-        config = {
-            "host": "127.0.0.1",  # Use localhost instead of 0.0.0.0 on Windows
-            "port": 8000,
-            "reload": False,
-            "log_level": "warning",  # Reduce log noise
-            "access_log": False,
-            "use_colors": True,
-            "loop": "asyncio"
-        }
-        
-        return config
+        # Copy so callers can tweak their config without mutating the shared one
+        return _UVICORN_CONFIG.copy()
 
 
 def is_connection_reset_error_safe(exception: Exception) -> bool:
@@ -111,94 +166,81 @@ def is_connection_reset_error_safe(exception: Exception) -> bool:
     On Windows, these errors often occur during file uploads when the client
     closes the connection after the server has already processed the request.
     """
-    if not isinstance(exception, ConnectionResetError):
-        return False
-    
-    if platform.system() != "Windows":
-        return False
-    
-    # Check if this is the common Windows error code
-    error_code = getattr(exception, 'winerror', None)
-    if error_code == 10054:  # WSAECONNRESET
-        return True
-    
-    return False
+    # Cheapest check first; 10054 is WSAECONNRESET
+    return (_IS_WINDOWS
+            and isinstance(exception, ConnectionResetError)
+            and getattr(exception, 'winerror', 0) == 10054)
+
 
+# Short-circuits repeat apply_windows_patches calls within one module
+# lifetime. This bool resets on importlib.reload, so the saved-original
+# attribute checks below remain the guard that actually prevents the
+# patches stacking on their own wrappers across reloads.
+_PATCHES_APPLIED = False
 
 # Comprehensive Windows connection reset fixes
-if platform.system() == "Windows":
-    
+if _IS_WINDOWS:
+
     def apply_windows_patches():
         """Apply all necessary Windows patches for connection handling."""
+        global _PATCHES_APPLIED
+        if _PATCHES_APPLIED:
+            return
+        _PATCHES_APPLIED = True
+
         try:
-            # Patch socket operations
+            # Patch socket operations; the saved-original check survives a
+            # module reload, where re-saving would capture our own wrapper
             import socket
-            original_socket_shutdown = getattr(socket.socket, '_original_shutdown', None)
-            if not original_socket_shutdown:
+            if getattr(socket.socket, '_original_shutdown', None) is None:
                 socket.socket._original_shutdown = socket.socket.shutdown
-                
-                def safe_shutdown(self, how):
+
+                # Bind the original as a default argument so each call skips
+                # the class-attribute lookup; a dead socket raises from the
+                # original shutdown itself, so no separate fileno() probe is
+                # needed
+                def safe_shutdown(self, how, _orig=socket.socket._original_shutdown):
                     try:
-                        if self.fileno() != -1:  # Socket is still valid
-                            return socket.socket._original_shutdown(self, how)
+                        return _orig(self, how)
                     except (ConnectionResetError, OSError, ValueError):
                         # Ignore all socket shutdown errors on Windows
                         pass
-                
+
                 socket.socket.shutdown = safe_shutdown
-            
+
             # Patch asyncio proactor events
             try:
                 from asyncio import proactor_events
-                original_call_connection_lost = getattr(proactor_events._ProactorBasePipeTransport, '_original_call_connection_lost', None)
-                
-                if not original_call_connection_lost:
+                if getattr(proactor_events._ProactorBasePipeTransport, '_original_call_connection_lost', None) is None:
                     proactor_events._ProactorBasePipeTransport._original_call_connection_lost = proactor_events._ProactorBasePipeTransport._call_connection_lost
-                    
+
                     def patched_call_connection_lost(self, exc):
                         # Just ignore all connection lost calls on Windows to prevent socket errors
                         if exc and isinstance(exc, (ConnectionResetError, OSError)):
                             return
-                        
+
                         # For clean disconnections (exc is None), also ignore to prevent shutdown errors
                         if exc is None:
                             return
-                        
+
                         # For other exceptions, try original but catch errors
                         try:
                             return proactor_events._ProactorBasePipeTransport._original_call_connection_lost(self, exc)
                         except (ConnectionResetError, OSError, ValueError):
                             return
-                    
+
                     proactor_events._ProactorBasePipeTransport._call_connection_lost = patched_call_connection_lost
-            
+
             except ImportError:
                 pass
             
-            # Set up better error handling for asyncio
-            def handle_exception(loop, context):
-                exception = context.get('exception')
-                if isinstance(exception, (ConnectionResetError, ConnectionAbortedError)):
-                    # Silently ignore connection reset errors
-                    return
-                
-                # For other exceptions, just log them at debug level
-                message = context.get('message', '')
-                if 'connection' in message.lower() and 'reset' in message.lower():
-                    return
-                
-                # Default handling for real errors
-                logging.getLogger('asyncio').debug(f"Asyncio exception: {context}")
-            
-            # Apply exception handler to current loop
-            try:
-                loop = asyncio.get_event_loop()
-                loop.set_exception_handler(handle_exception)
-            except RuntimeError:
-                pass
-                
+            # The asyncio exception handler is installed per-loop by
+            # SilentProactorPolicy.new_event_loop; mutating
+            # asyncio.get_event_loop() here would create a throwaway loop
+            # that uvicorn immediately replaces.
+
         except Exception as e:
-            print(f"Warning: Could not apply all Windows patches: {e}")
+            _log.warning(f"Could not apply all Windows patches: {e}")
     
     # Apply patches immediately when module is imported
     apply_windows_patches()